@@ -9,11 +9,12 @@ from pydantic import BaseModel
 import logging
 
 from app.services.gemini_service import GeminiService
+from app.api.routing import TimedRoute
 from app.core.settings import settings
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/gemini", tags=["gemini"])
+router = APIRouter(prefix="/gemini", tags=["gemini"], route_class=TimedRoute)
 
 # Pydantic models for request/response
 class TextGenerationRequest(BaseModel):
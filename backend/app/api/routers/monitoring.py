@@ -0,0 +1,45 @@
+"""
+Monitoring API Router
+Serves resource history and the shared live metrics WebSocket
+"""
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from typing import Optional
+import logging
+
+from app.services.resource_monitor import resource_monitor, BASE_RESOLUTION, RESOLUTIONS
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/monitoring",
+    tags=["monitoring"],
+    on_startup=[resource_monitor.start],
+    on_shutdown=[resource_monitor.stop],
+)
+
+@router.get("/resources")
+async def get_resource_history(
+    resolution: str = Query(BASE_RESOLUTION, description=f"One of {', '.join(RESOLUTIONS)}"),
+    limit: Optional[int] = Query(None, ge=1)
+):
+    """Get buffered CPU, memory, disk and latency history at a given resolution"""
+    try:
+        return resource_monitor.snapshot(resolution, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.websocket("/ws")
+async def resource_feed(websocket: WebSocket):
+    """Stream per-tick metric deltas; the first message is a snapshot of recent history"""
+    try:
+        await resource_monitor.connect(websocket)
+        # Nothing is expected from clients; this just waits for the disconnect
+        while True:
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Error in monitoring websocket: {str(e)}")
+    finally:
+        resource_monitor.disconnect(websocket)
@@ -0,0 +1,30 @@
+"""
+API Routing Helpers
+Custom route classes shared by the routers
+"""
+
+import time
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.services.resource_monitor import resource_monitor
+
+
+class TimedRoute(APIRoute):
+    """Route class that records per-endpoint latency into the resource monitor"""
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+        methods = ",".join(sorted(self.methods))
+
+        async def timed_handler(request: Request) -> Response:
+            start = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                key = f"{methods} {request.scope.get('root_path', '')}{self.path_format}"
+                resource_monitor.record_latency(key, (time.perf_counter() - start) * 1000)
+
+        return timed_handler
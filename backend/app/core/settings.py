@@ -4,7 +4,8 @@ Application settings and configuration
 
 import os
 from typing import Optional
-from pydantic import BaseSettings, Field
+from pydantic import Field
+from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     """Application settings"""
@@ -35,6 +36,14 @@ class Settings(BaseSettings):
     # Logging settings
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     
+    # Resource monitor settings
+    monitor_sample_interval: float = Field(default=1.0, gt=0, env="MONITOR_SAMPLE_INTERVAL")
+    monitor_history_samples: int = Field(default=3600, gt=0, env="MONITOR_HISTORY_SAMPLES")
+    monitor_history_minutes: int = Field(default=1440, gt=0, env="MONITOR_HISTORY_MINUTES")
+    monitor_history_hours: int = Field(default=720, gt=0, env="MONITOR_HISTORY_HOURS")
+    monitor_max_latency_series: int = Field(default=64, gt=0, env="MONITOR_MAX_LATENCY_SERIES")
+    monitor_disk_path: str = Field(default=os.path.abspath(os.sep), env="MONITOR_DISK_PATH")
+    
     # Development settings
     debug: bool = Field(default=False, env="DEBUG")
     
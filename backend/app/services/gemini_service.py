@@ -4,10 +4,13 @@ Handles communication with Google's Gemini API
 """
 
 import os
+import time
 from typing import Optional, Dict, Any, List
 from google import genai
 import logging
 
+from app.services.resource_monitor import resource_monitor
+
 logger = logging.getLogger(__name__)
 
 class GeminiService:
@@ -35,10 +38,15 @@ class GeminiService:
         """
         try:
             model_name = model or self.model
-            response = self.client.models.generate_content(
-                model=model_name,
-                contents=prompt
-            )
+            start = time.perf_counter()
+            try:
+                response = self.client.models.generate_content(
+                    model=model_name,
+                    contents=prompt
+                )
+            finally:
+                # Failed and timed-out calls count too, they are usually the slowest
+                resource_monitor.record_latency(self._latency_key(model_name), (time.perf_counter() - start) * 1000)
             
             return {
                 "success": True,
@@ -105,10 +113,15 @@ class GeminiService:
                         'parts': [{'text': content}]
                     })
             
-            response = self.client.models.generate_content(
-                model=model_name,
-                contents=contents
-            )
+            start = time.perf_counter()
+            try:
+                response = self.client.models.generate_content(
+                    model=model_name,
+                    contents=contents
+                )
+            finally:
+                # Failed and timed-out calls count too, they are usually the slowest
+                resource_monitor.record_latency(self._latency_key(model_name), (time.perf_counter() - start) * 1000)
             
             return {
                 "success": True,
@@ -190,6 +203,12 @@ class GeminiService:
             "gemini-1.5-pro"
         ]
     
+    def _latency_key(self, model_name: str) -> str:
+        """Latency series name for a model; unknown names share one series"""
+        if model_name in self.get_available_models():
+            return f"llm:{model_name}"
+        return "llm:other"
+    
     async def health_check(self) -> Dict[str, Any]:
         """
         Check if the Gemini API is accessible
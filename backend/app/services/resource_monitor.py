@@ -0,0 +1,336 @@
+"""
+Resource Monitor Service
+Samples system resources and request/LLM latency in the background
+and pushes deltas to WebSocket subscribers
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import psutil
+from fastapi import WebSocket
+
+from app.core.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Finest resolution: one row per sample, taken every monitor_sample_interval seconds
+BASE_RESOLUTION = "raw"
+
+# Rollup resolutions: name -> bucket width in seconds
+ROLLUPS: Dict[str, int] = {"1m": 60, "1h": 3600}
+
+RESOLUTIONS: Tuple[str, ...] = (BASE_RESOLUTION, *ROLLUPS)
+
+SYSTEM_COLUMNS = ("cpu", "memory", "disk")
+SYSTEM_AGGREGATES = ("mean", "mean", "mean")
+
+LATENCY_COLUMNS = ("count", "total_ms", "max_ms")
+LATENCY_AGGREGATES = ("sum", "sum", "max")
+
+
+class RingBuffer:
+    """Fixed-size ring buffer of timestamped float rows backed by numpy"""
+
+    def __init__(self, capacity: int, width: int):
+        self.capacity = capacity
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._values = np.zeros((capacity, width), dtype=np.float64)
+        self._head = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, row: np.ndarray) -> None:
+        """Overwrite the oldest row with a new one"""
+        self._timestamps[self._head] = timestamp
+        self._values[self._head] = row
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def last(self, n: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return the most recent rows in chronological order
+
+        Args:
+            n: Number of rows to return (defaults to everything buffered)
+
+        Returns:
+            Tuple of (timestamps, values) arrays
+        """
+        n = self._size if n is None else max(0, min(n, self._size))
+        idx = (np.arange(self._head - n, self._head)) % self.capacity
+        return self._timestamps[idx], self._values[idx]
+
+
+class _Bucket:
+    """Accumulates rows for one rollup bucket until it is closed"""
+
+    def __init__(self, width: int, aggregates: Tuple[str, ...]):
+        self.width = width
+        self.start: Optional[float] = None
+        self._sum_mask = np.array([a in ("mean", "sum") for a in aggregates])
+        self._mean_mask = np.array([a == "mean" for a in aggregates])
+        self._acc = np.zeros(len(aggregates), dtype=np.float64)
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, row: np.ndarray) -> None:
+        if self._count == 0:
+            self._acc[:] = row
+        else:
+            self._acc = np.where(self._sum_mask, self._acc + row, np.maximum(self._acc, row))
+        self._count += 1
+
+    def close(self) -> np.ndarray:
+        row = np.where(self._mean_mask, self._acc / max(self._count, 1), self._acc)
+        self._count = 0
+        return row
+
+
+class RollupSeries:
+    """A set of columns kept per sample with 1m and 1h downsampled rollups"""
+
+    def __init__(self, columns: Tuple[str, ...], aggregates: Tuple[str, ...], capacities: Dict[str, int]):
+        self.columns = columns
+        self.buffers = {
+            name: RingBuffer(capacities[name], len(columns)) for name in RESOLUTIONS
+        }
+        self._buckets = {
+            name: _Bucket(width, aggregates)
+            for name, width in ROLLUPS.items()
+        }
+
+    def advance(self, timestamp: float) -> None:
+        """Close any rollup bucket that ended before timestamp, even if no row arrives"""
+        for name, bucket in self._buckets.items():
+            start = timestamp - (timestamp % bucket.width)
+            if bucket.start is not None and start != bucket.start:
+                if len(bucket):
+                    self.buffers[name].append(bucket.start, bucket.close())
+                bucket.start = None
+
+    def append(self, timestamp: float, row: np.ndarray) -> None:
+        """Record a sample row and roll it up into the coarser resolutions"""
+        self.buffers[BASE_RESOLUTION].append(timestamp, row)
+        self.advance(timestamp)
+        for bucket in self._buckets.values():
+            if bucket.start is None:
+                bucket.start = timestamp - (timestamp % bucket.width)
+            bucket.add(row)
+
+    def history(self, resolution: str, limit: Optional[int] = None) -> Dict[str, List[float]]:
+        """Return buffered history as column-oriented lists"""
+        timestamps, values = self.buffers[resolution].last(limit)
+        result = {"timestamps": timestamps.tolist()}
+        for i, column in enumerate(self.columns):
+            result[column] = values[:, i].round(2).tolist()
+        return result
+
+
+class ResourceMonitor:
+    """
+    Single background sampler shared by every dashboard and monitoring client.
+
+    System metrics and latency are sampled once per tick regardless of how many
+    clients are connected; each tick's delta is serialized once and sent to all
+    WebSocket subscribers.
+    """
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval if interval is not None else settings.monitor_sample_interval
+        if self.interval <= 0:
+            raise ValueError(f"Sample interval must be positive, got {self.interval}")
+        self._capacities = {
+            BASE_RESOLUTION: settings.monitor_history_samples,
+            "1m": settings.monitor_history_minutes,
+            "1h": settings.monitor_history_hours,
+        }
+        self.system = RollupSeries(SYSTEM_COLUMNS, SYSTEM_AGGREGATES, self._capacities)
+        self.max_latency_series = settings.monitor_max_latency_series
+        # Least recently recorded first, so the oldest key is evicted at the cap
+        self.latency: "OrderedDict[str, RollupSeries]" = OrderedDict()
+        self._pending: Dict[str, List[float]] = {}
+        self._clients: Set[WebSocket] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    # --- Recording ---
+
+    def record_latency(self, key: str, duration_ms: float) -> None:
+        """
+        Record a latency observation, aggregated into the next tick
+
+        Args:
+            key: Series name, e.g. "GET /api/v1/gemini/models" or "llm:gemini-2.5-flash"
+            duration_ms: Observed duration in milliseconds
+        """
+        pending = self._pending.get(key)
+        if pending is None:
+            self._pending[key] = [1, duration_ms, duration_ms]
+        else:
+            pending[0] += 1
+            pending[1] += duration_ms
+            pending[2] = max(pending[2], duration_ms)
+
+    def sample(self, timestamp: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Take one sample of all metrics and return it as a delta message
+
+        Returns:
+            Dict with the system row and any latency recorded since the last tick
+        """
+        timestamp = round(timestamp if timestamp is not None else time.time(), 3)
+        row = np.array([
+            psutil.cpu_percent(interval=None),
+            psutil.virtual_memory().percent,
+            psutil.disk_usage(settings.monitor_disk_path).percent,
+        ])
+        self.system.append(timestamp, row)
+
+        pending, self._pending = self._pending, {}
+        latency = {}
+        for key, values in pending.items():
+            series = self.latency.get(key)
+            if series is None:
+                series = RollupSeries(LATENCY_COLUMNS, LATENCY_AGGREGATES, self._capacities)
+                self.latency[key] = series
+                while len(self.latency) > self.max_latency_series:
+                    evicted, _ = self.latency.popitem(last=False)
+                    logger.debug(f"Evicting latency series '{evicted}'")
+            else:
+                self.latency.move_to_end(key)
+            series.append(timestamp, np.array(values))
+            # Same fields as history() so clients can append deltas to a snapshot
+            latency[key] = dict(zip(LATENCY_COLUMNS, np.round(values, 2).tolist()))
+        for key, series in self.latency.items():
+            if key not in pending:
+                series.advance(timestamp)
+
+        return {
+            "type": "delta",
+            "timestamp": timestamp,
+            "system": dict(zip(SYSTEM_COLUMNS, row.round(2).tolist())),
+            "latency": latency,
+        }
+
+    def snapshot(self, resolution: str = BASE_RESOLUTION, limit: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Return buffered history for a resolution
+
+        Args:
+            resolution: One of "raw", "1m" or "1h"
+            limit: Maximum number of points per series
+
+        Returns:
+            Dict with system and per-key latency history
+        """
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}', expected one of {list(RESOLUTIONS)}")
+        latest, _ = self.system.buffers[BASE_RESOLUTION].last(1)
+        return {
+            "type": "snapshot",
+            "resolution": resolution,
+            "interval": self.interval,
+            # Deltas at or before this timestamp are already in the snapshot
+            "timestamp": latest[0].item() if len(latest) else None,
+            "system": self.system.history(resolution, limit),
+            "latency": {
+                key: series.history(resolution, limit) for key, series in self.latency.items()
+            },
+        }
+
+    # --- Lifecycle ---
+
+    async def start(self) -> None:
+        """Start the background sampling loop"""
+        if self._task is not None and not self._task.done():
+            return
+        # Fail at startup rather than logging the same error on every tick
+        try:
+            psutil.disk_usage(settings.monitor_disk_path)
+        except OSError as e:
+            raise ValueError(f"Invalid MONITOR_DISK_PATH '{settings.monitor_disk_path}': {str(e)}") from e
+        psutil.cpu_percent(interval=None)  # Prime the counter; the first reading is always 0
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Resource monitor started with {self.interval}s interval")
+
+    async def stop(self) -> None:
+        """Stop the sampling loop and close all subscribers"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        clients = list(self._clients)
+        self._clients.clear()
+        await self._close_all(clients)
+        logger.info("Resource monitor stopped")
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        while True:
+            try:
+                delta = self.sample()
+                if self._clients:
+                    await self._broadcast(json.dumps(delta))
+            except Exception as e:
+                logger.error(f"Error sampling resources: {str(e)}")
+            # Skip ticks missed while the loop was blocked instead of replaying them
+            next_tick = max(next_tick + self.interval, loop.time())
+            await asyncio.sleep(next_tick - loop.time())
+
+    # --- Subscribers ---
+
+    async def connect(self, websocket: WebSocket, limit: int = 60) -> None:
+        """Accept a subscriber and send it the most recent samples"""
+        await websocket.accept()
+        # Subscribe in the same step as taking the snapshot so no tick falls between them
+        message = json.dumps(self.snapshot(BASE_RESOLUTION, limit))
+        self._clients.add(websocket)
+        try:
+            await asyncio.wait_for(websocket.send_text(message), timeout=self.interval)
+        except Exception:
+            self.disconnect(websocket)
+            await self._close_all([websocket])
+            raise
+
+    def disconnect(self, websocket: WebSocket) -> None:
+        self._clients.discard(websocket)
+
+    async def _close_all(self, websockets: List[WebSocket]) -> None:
+        """Close subscribers concurrently so the clients see the disconnect and can reconnect"""
+        await asyncio.gather(
+            *(asyncio.wait_for(ws.close(), timeout=self.interval) for ws in websockets),
+            return_exceptions=True,
+        )
+
+    async def _broadcast(self, message: str) -> None:
+        clients = list(self._clients)
+        results = await asyncio.gather(
+            *(asyncio.wait_for(ws.send_text(message), timeout=self.interval) for ws in clients),
+            return_exceptions=True,
+        )
+        dropped = []
+        for websocket, result in zip(clients, results):
+            if isinstance(result, Exception):
+                logger.debug(f"Dropping monitor subscriber: {str(result)}")
+                self.disconnect(websocket)
+                dropped.append(websocket)
+        if dropped:
+            await self._close_all(dropped)
+
+
+# Global monitor instance
+resource_monitor = ResourceMonitor()
+
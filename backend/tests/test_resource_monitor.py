@@ -0,0 +1,299 @@
+"""
+Tests for the resource monitor service
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.core.settings import Settings
+from app.services import resource_monitor as rm
+from app.services.resource_monitor import (
+    BASE_RESOLUTION,
+    ResourceMonitor,
+    RingBuffer,
+    RollupSeries,
+    _Bucket,
+)
+
+CAPACITIES = {"raw": 10, "1m": 10, "1h": 10}
+
+
+@pytest.fixture(autouse=True)
+def default_settings(monkeypatch):
+    """Run on defaults, ignoring any MONITOR_* values in the local .env"""
+    test_settings = Settings(_env_file=None)
+    monkeypatch.setattr(rm, "settings", test_settings)
+    return test_settings
+
+
+@pytest.fixture
+def fake_psutil(monkeypatch):
+    """Patch psutil with fixed readings that tests can change"""
+    readings = {"cpu": 10.0, "memory": 50.0, "disk": 70.0}
+    monkeypatch.setattr(rm.psutil, "cpu_percent", lambda interval=None: readings["cpu"])
+    monkeypatch.setattr(rm.psutil, "virtual_memory", lambda: SimpleNamespace(percent=readings["memory"]))
+    monkeypatch.setattr(rm.psutil, "disk_usage", lambda path: SimpleNamespace(percent=readings["disk"]))
+    return readings
+
+
+@pytest.fixture
+def monitor(fake_psutil):
+    return ResourceMonitor(interval=1.0)
+
+
+# --- RingBuffer ---
+
+def test_ring_buffer_wraps_around_keeping_newest_rows():
+    buffer = RingBuffer(capacity=3, width=1)
+    for i in range(5):
+        buffer.append(float(i), np.array([i * 10.0]))
+
+    timestamps, values = buffer.last()
+    assert len(buffer) == 3
+    assert timestamps.tolist() == [2.0, 3.0, 4.0]
+    assert values[:, 0].tolist() == [20.0, 30.0, 40.0]
+
+
+def test_ring_buffer_last_n_is_clamped():
+    buffer = RingBuffer(capacity=4, width=1)
+    for i in range(6):
+        buffer.append(float(i), np.array([float(i)]))
+
+    assert buffer.last(2)[0].tolist() == [4.0, 5.0]
+    assert buffer.last(0)[0].tolist() == []
+    assert buffer.last(100)[0].tolist() == [2.0, 3.0, 4.0, 5.0]
+    assert RingBuffer(capacity=4, width=1).last()[0].tolist() == []
+
+
+# --- _Bucket ---
+
+def test_bucket_aggregates_mean_sum_and_max():
+    bucket = _Bucket(60, ("mean", "sum", "max"))
+    bucket.add(np.array([10.0, 1.0, 5.0]))
+    bucket.add(np.array([20.0, 2.0, 3.0]))
+    bucket.add(np.array([30.0, 3.0, 9.0]))
+
+    assert bucket.close().tolist() == [20.0, 6.0, 9.0]
+    assert len(bucket) == 0
+
+    bucket.add(np.array([4.0, 4.0, 4.0]))
+    assert bucket.close().tolist() == [4.0, 4.0, 4.0]
+
+
+# --- RollupSeries ---
+
+def test_rollup_closes_buckets_at_boundaries():
+    series = RollupSeries(("value",), ("mean",), CAPACITIES)
+    for t in range(0, 121):
+        series.append(float(t), np.array([1.0 if t < 60 else 3.0]))
+
+    history = series.history("1m")
+    assert history["timestamps"] == [0.0, 60.0]
+    assert history["value"] == [1.0, 3.0]
+    assert series.history("1h")["timestamps"] == []
+    assert len(series.buffers[BASE_RESOLUTION]) == CAPACITIES["raw"]
+
+
+def test_rollup_advance_flushes_idle_buckets():
+    series = RollupSeries(("count",), ("sum",), CAPACITIES)
+    series.append(10.0, np.array([2.0]))
+    series.append(20.0, np.array([3.0]))
+
+    series.advance(59.0)
+    assert series.history("1m")["timestamps"] == []
+
+    series.advance(61.0)
+    assert series.history("1m") == {"timestamps": [0.0], "count": [5.0]}
+
+    # Nothing was added since, so later ticks do not emit empty rollups
+    series.advance(3601.0)
+    assert series.history("1m")["timestamps"] == [0.0]
+    assert series.history("1h") == {"timestamps": [0.0], "count": [5.0]}
+
+
+# --- ResourceMonitor ---
+
+def test_sample_records_system_metrics(monitor, fake_psutil):
+    delta = monitor.sample(timestamp=100.0)
+    assert delta["type"] == "delta"
+    assert delta["timestamp"] == 100.0
+    assert delta["system"] == {"cpu": 10.0, "memory": 50.0, "disk": 70.0}
+    assert delta["latency"] == {}
+
+    fake_psutil["cpu"] = 30.0
+    monitor.sample(timestamp=101.0)
+    assert monitor.snapshot()["system"]["cpu"] == [10.0, 30.0]
+
+
+def test_latency_delta_matches_history_schema(monitor):
+    monitor.record_latency("llm:test", 100.0)
+    monitor.record_latency("llm:test", 300.0)
+    delta = monitor.sample(timestamp=0.0)
+
+    assert delta["latency"] == {"llm:test": {"count": 2.0, "total_ms": 400.0, "max_ms": 300.0}}
+    history = monitor.snapshot()["latency"]["llm:test"]
+    assert set(history) == {"timestamps", *delta["latency"]["llm:test"]}
+    assert history["total_ms"] == [400.0]
+
+    # Pending observations are consumed by the tick
+    assert monitor.sample(timestamp=1.0)["latency"] == {}
+
+
+def test_idle_latency_series_rolls_up_without_new_requests(monitor):
+    for t in range(0, 5):
+        monitor.record_latency("GET /api/v1/gemini/models", 50.0)
+        monitor.sample(timestamp=float(t))
+    for t in range(5, 61):
+        monitor.sample(timestamp=float(t))
+
+    history = monitor.snapshot("1m")["latency"]["GET /api/v1/gemini/models"]
+    assert history == {"timestamps": [0.0], "count": [5.0], "total_ms": [250.0], "max_ms": [50.0]}
+
+
+def test_latency_series_are_capped_with_lru_eviction(monitor):
+    monitor.max_latency_series = 5
+    monitor.record_latency("llm:kept", 10.0)
+    monitor.sample(timestamp=0.0)
+    for t in range(1, 501):
+        monitor.record_latency(f"llm:model-{t}", 10.0)
+        if t % 3 == 0:
+            monitor.record_latency("llm:kept", 10.0)
+        monitor.sample(timestamp=float(t))
+        assert len(monitor.latency) <= 5
+
+    assert "llm:kept" in monitor.latency
+    assert "llm:model-500" in monitor.latency
+    assert "llm:model-1" not in monitor.latency
+    assert len(monitor.snapshot()["latency"]) == 5
+
+
+def test_snapshot_rejects_unknown_resolution(monitor):
+    with pytest.raises(ValueError):
+        monitor.snapshot("5m")
+    assert monitor.snapshot("1h")["resolution"] == "1h"
+
+
+def test_non_positive_interval_is_rejected():
+    with pytest.raises(ValueError):
+        ResourceMonitor(interval=0)
+    with pytest.raises(ValueError):
+        ResourceMonitor(interval=-1.0)
+
+
+class FakeWebSocket:
+    """WebSocket stand-in that records traffic and can fail sends"""
+
+    def __init__(self, tracker=None, fail_send=False):
+        self.tracker = tracker
+        self.fail_send = fail_send
+        self.sent = []
+        self.closed = False
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        if self.fail_send:
+            raise RuntimeError("client went away")
+        self.sent.append(message)
+
+    async def close(self):
+        self.tracker["active"] += 1
+        self.tracker["peak"] = max(self.tracker["peak"], self.tracker["active"])
+        await asyncio.sleep(0)
+        self.tracker["active"] -= 1
+        self.closed = True
+
+
+@pytest.mark.asyncio
+async def test_broadcast_drops_and_closes_failed_clients_concurrently(monitor):
+    tracker = {"active": 0, "peak": 0}
+    healthy = FakeWebSocket(tracker)
+    failing = [FakeWebSocket(tracker, fail_send=True) for _ in range(4)]
+    monitor._clients.update([healthy, *failing])
+
+    await monitor._broadcast("tick")
+
+    assert monitor._clients == {healthy}
+    assert healthy.sent == ["tick"] and not healthy.closed
+    assert all(ws.closed for ws in failing)
+    assert tracker["peak"] == len(failing)
+
+    await monitor.stop()
+    assert healthy.closed and not monitor._clients
+
+
+@pytest.mark.asyncio
+async def test_connect_subscribes_and_sends_snapshot_with_latest_timestamp(monitor):
+    monitor.sample(timestamp=5.0)
+    websocket = FakeWebSocket()
+
+    await monitor.connect(websocket)
+
+    assert websocket in monitor._clients
+    snapshot = json.loads(websocket.sent[0])
+    assert snapshot["type"] == "snapshot"
+    assert snapshot["timestamp"] == 5.0
+
+
+@pytest.mark.asyncio
+async def test_connect_drops_client_that_stalls_on_the_snapshot(monitor):
+    class StalledWebSocket(FakeWebSocket):
+        async def send_text(self, message):
+            await asyncio.Event().wait()
+
+    monitor.interval = 0.01
+    tracker = {"active": 0, "peak": 0}
+    websocket = StalledWebSocket(tracker)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await monitor.connect(websocket)
+    assert websocket not in monitor._clients
+    assert websocket.closed
+
+
+@pytest.mark.asyncio
+async def test_start_rejects_invalid_disk_path(monitor, monkeypatch):
+    def missing(path):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(rm.psutil, "disk_usage", missing)
+    with pytest.raises(ValueError, match="MONITOR_DISK_PATH"):
+        await monitor.start()
+    assert monitor._task is None
+
+
+@pytest.mark.asyncio
+async def test_run_skips_ticks_missed_during_a_stall(monitor, monkeypatch):
+    clock = {"now": 0.0}
+    sample_times = []
+    sleeps = []
+
+    class StopLoop(Exception):
+        pass
+
+    def stalling_sample():
+        sample_times.append(clock["now"])
+        if len(sample_times) == 1:
+            clock["now"] += 6.0  # Block the loop like a synchronous LLM call
+        return {}
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+        clock["now"] += delay
+        if len(sleeps) == 5:
+            raise StopLoop
+
+    monkeypatch.setattr(rm.asyncio, "get_running_loop", lambda: SimpleNamespace(time=lambda: clock["now"]))
+    monkeypatch.setattr(rm.asyncio, "sleep", fake_sleep)
+    monitor.sample = stalling_sample
+
+    with pytest.raises(StopLoop):
+        await monitor._run()
+
+    assert sleeps == [0.0, 1.0, 1.0, 1.0, 1.0]
+    assert sample_times == [0.0, 6.0, 7.0, 8.0, 9.0]